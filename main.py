@@ -9,19 +9,20 @@ from pathlib import Path
 from loguru import logger
 from pydantic import ValidationError
 
-from src.audio.line_player import LinePlayer
+from src.audio.line_player import LinePlayer, RenderedLineAudioCache
 from src.audio.repeating_player import RepeatingAudioPlayer
 from src.audio.tts import generate_audio
 from src.config import Config, read_args
 from src.hypno_queue import (
     queue_hypno_lines,
+    update_hypno_line_mapping,
 )
 from src.log import configure_logger
 
 DEFAULT_CONFIG_PATH = Path("./config.json")
 DEFAULT_TEXT_PATH = Path("./lines.txt")
-BACKGROUND_CHUNK_SIZE = 8000
-LINE_CHUNK_SIZE = 96_000
+BACKGROUND_CHUNK_DURATION = 0.2
+LINE_CHUNK_DURATION = 2.0
 LINE_DIR = Path("./import/lines")
 
 BACKGROUND_AUDIO: dict[str, Path] = {
@@ -60,17 +61,14 @@ def main() -> None:
         logger.critical(f"Text file {args.text_filepath} not found. Please ensure it exists.")
         sys.exit(1)
 
-    manager = multiprocessing.Manager()
-    hypno_line_mapping = manager.dict()
-    hypno_lines_lock = manager.Lock()
+    hypno_line_updates = multiprocessing.Queue()
 
     audio_generator_process = multiprocessing.Process(
         target=generate_audio,
         kwargs={
             "text_filepath": args.text_filepath,
             "output_audio_dir": LINE_DIR,
-            "hypno_line_mapping": hypno_line_mapping,
-            "hypno_lines_lock": hypno_lines_lock,
+            "hypno_line_updates": hypno_line_updates,
             # needed because the audio generator process is a separate process, so the logger needs to be set up again
             "debug": args.debug,
         },
@@ -80,8 +78,27 @@ def main() -> None:
     audio_generator_process.start()
 
     # Wait for the audio generator to finish generating lines the first time
+    hypno_line_mapping = hypno_line_updates.get()
     while not hypno_line_mapping:
-        time.sleep(0.1)
+        hypno_line_mapping = hypno_line_updates.get()
+
+    # Rendered line audio is shared between the line players, and dropped once its line is no longer in the mapping
+    rendered_line_audio = RenderedLineAudioCache()
+    rendered_line_audio.retain_lines(hypno_line_mapping)
+
+    # Keep the mapping up to date with any lines generated from later changes to the text file
+    hypno_lines_condition = threading.Condition()
+    hypno_line_mapping_thread = threading.Thread(
+        target=update_hypno_line_mapping,
+        kwargs={
+            "hypno_line_updates": hypno_line_updates,
+            "hypno_line_mapping": hypno_line_mapping,
+            "hypno_lines_condition": hypno_lines_condition,
+            "on_update": rendered_line_audio.retain_lines,
+        },
+        daemon=True,
+    )
+    hypno_line_mapping_thread.start()
 
     # BACKGROUND AUDIO
     # ================
@@ -89,7 +106,7 @@ def main() -> None:
         background_player = RepeatingAudioPlayer(audio_filepath=BACKGROUND_AUDIO[config.background_audio])
         background_player_thread = threading.Thread(
             target=background_player.play_audio_file,
-            kwargs={"chunk_size": BACKGROUND_CHUNK_SIZE},
+            kwargs={"chunk_duration": BACKGROUND_CHUNK_DURATION},
             daemon=True,
         )
         background_player_thread.start()
@@ -102,8 +119,8 @@ def main() -> None:
     # Two line players are needed - one starting just after the first line is played, but while it's still playing the
     # echoes
     line_players = [
-        LinePlayer.from_config(config),
-        LinePlayer.from_config(config),
+        LinePlayer.from_config(config, rendered_line_audio=rendered_line_audio),
+        LinePlayer.from_config(config, rendered_line_audio=rendered_line_audio),
     ]
 
     filepath_queue_thread = threading.Thread(
@@ -112,7 +129,7 @@ def main() -> None:
             "hypno_line_chooser": config.line_chooser,
             "line_players": line_players,
             "hypno_line_mapping": hypno_line_mapping,
-            "hypno_lines_lock": hypno_lines_lock,
+            "hypno_lines_condition": hypno_lines_condition,
         },
         daemon=True,
     )
@@ -122,7 +139,7 @@ def main() -> None:
         line_player_thread = threading.Thread(
             target=line_player.play_audio_files,
             kwargs={
-                "chunk_size": LINE_CHUNK_SIZE,
+                "chunk_duration": LINE_CHUNK_DURATION,
                 "max_delay": config.max_echoes * config.echo_delay,
             },
         )
@@ -136,7 +153,7 @@ def main() -> None:
         mantra_player = RepeatingAudioPlayer(audio_filepath=config.mantra_filepath)
         mantra_player_thread = threading.Thread(
             target=mantra_player.play_audio_file,
-            kwargs={"chunk_size": BACKGROUND_CHUNK_SIZE},
+            kwargs={"chunk_duration": BACKGROUND_CHUNK_DURATION},
             daemon=True,
         )
         mantra_player_thread.start()
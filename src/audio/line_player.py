@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import threading
+from functools import cache
 from queue import Queue
 from typing import TYPE_CHECKING, Self, final
 
@@ -17,9 +19,114 @@ from pedalboard.io import AudioFile, AudioStream
 from src.hypno_line import HypnoLine
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+    from pathlib import Path
+
     from src.config import Config
 
 
+def _render_line_audio(pedalboard: Pedalboard, filepath: Path, sample_rate: float, max_delay: float) -> np.ndarray:
+    """Read a line's audio file and apply the pedalboard effects."""
+    with AudioFile(str(filepath), "r").resampled_to(sample_rate) as audio_file:  # ty:ignore[no-matching-overload, unresolved-attribute]
+        audio_data = audio_file.read(audio_file.frames)
+
+    # Add MAX_DELAY silence at the end (so that all delays can be heard)
+    audio_data = np.pad(audio_data, [(0, 0), (0, int(max_delay * sample_rate))])
+
+    return pedalboard(audio_data, sample_rate)
+
+
+@final
+class RenderedLineAudioCache:
+    """Rendered audio for each line, kept for as long as the line is in the hypno line mapping.
+
+    Line audio files are named after a hash of their text and the effects are deterministic, so a pedalboard and
+    filepath always render the same audio, and every line in the script only has to be rendered once.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty cache, which keeps the audio of every line until it is told which lines are current."""
+        self._lock = threading.Lock()
+        self._rendered_audio: dict[Path, dict[tuple[Pedalboard, float, float], np.ndarray]] = {}
+        self._current_filepaths: set[Path] | None = None
+
+    def get(self, pedalboard: Pedalboard, filepath: Path, sample_rate: float, max_delay: float) -> np.ndarray:
+        """Return a line's audio with the pedalboard effects applied, rendering it only if it hasn't been already.
+
+        The returned array is read-only, as it is shared between every play of the line.
+
+        Args:
+            pedalboard (Pedalboard): The Pedalboard instance containing audio effects.
+            filepath (Path): The path to the line's audio file.
+            sample_rate (float): The sample rate to render the audio at.
+            max_delay (float): The maximum delay in seconds to add at the end of the audio.
+
+        Returns:
+            np.ndarray: The rendered audio.
+        """
+        render_key = (pedalboard, sample_rate, max_delay)
+
+        with self._lock:
+            rendered_audio = self._rendered_audio.get(filepath, {}).get(render_key)
+
+        if rendered_audio is None:
+            # Rendered outside the lock, so other players aren't held up by it
+            rendered_audio = _render_line_audio(pedalboard, filepath, sample_rate, max_delay)
+            rendered_audio.flags.writeable = False
+
+            with self._lock:
+                # A line can still be played after it was removed from the mapping (by a chooser that took its
+                # snapshot before the update, or while it was being rendered), in which case it isn't kept
+                if self._current_filepaths is None or filepath in self._current_filepaths:
+                    self._rendered_audio.setdefault(filepath, {})[render_key] = rendered_audio
+
+        return rendered_audio
+
+    def retain_lines(self, hypno_line_mapping: Mapping[str, HypnoLine]) -> None:
+        """Keep only the rendered audio of the lines in the hypno line mapping, from now on.
+
+        Args:
+            hypno_line_mapping (Mapping[str, HypnoLine]): The mapping of line identifiers to the HypnoLine objects
+                that can still be played.
+        """
+        current_filepaths = {hypno_line.filepath for hypno_line in hypno_line_mapping.values()}
+
+        with self._lock:
+            self._current_filepaths = current_filepaths
+
+            for filepath in self._rendered_audio.keys() - current_filepaths:
+                del self._rendered_audio[filepath]
+
+
+@cache
+def _build_echo_pedalboard(*, initial_pitch_shift: float, max_echoes: int, echo_delay: float) -> Pedalboard:
+    """Build the pedalboard for the main voice and its echoes.
+
+    The pedalboard is cached so that line players built from the same settings share one pedalboard, and with it their
+    entries in the rendered line audio cache.
+    """
+    boards = [
+        # Main voice with a pitch shift (a shift of 0 is skipped, as it would only cost processing time)
+        Pedalboard([PitchShift(semitones=initial_pitch_shift)] if initial_pitch_shift else []),
+    ]
+
+    # Add echoes with decreasing pitch shift and volume, and increasing delay
+    boards.extend(
+        Pedalboard([
+            PitchShift(semitones=initial_pitch_shift - (i * 0.5)),  # Decrease pitch for each echo
+            Gain(gain_db=-12 * i),  # Decrease volume for each echo
+            Delay(delay_seconds=i * echo_delay, mix=0.5),  # Increase delay for each echo
+        ])
+        for i in range(1, max_echoes + 1)
+    )
+
+    # Without echoes there is nothing to mix, so the main voice board can be used directly
+    if len(boards) == 1:
+        return boards[0]
+
+    return Pedalboard([Mix(boards)])  # ty:ignore[invalid-argument-type]
+
+
 @final
 class LinePlayer:
     """A class that manages playback of audio files with a audio effects and initial delay.
@@ -27,25 +134,31 @@ class LinePlayer:
     Attributes:
         queue (Queue[Path]): A queue to hold audio file paths for playback.
         pedalboard (Pedalboard): The Pedalboard instance containing audio effects.
+        rendered_line_audio (RenderedLineAudioCache): The cache of rendered line audio, shared between line players.
     """
 
-    def __init__(self, *, pedalboard: Pedalboard) -> None:
+    def __init__(self, *, pedalboard: Pedalboard, rendered_line_audio: RenderedLineAudioCache) -> None:
         """Initialize a LinePlayer with a pedalboard.
 
         Args:
             pedalboard (Pedalboard): The Pedalboard instance containing audio effects.
+            rendered_line_audio (RenderedLineAudioCache): The cache of rendered line audio, shared between line
+                players.
         """
         self.pedalboard = pedalboard
+        self.rendered_line_audio = rendered_line_audio
         self.queue = Queue[HypnoLine](maxsize=1)
 
-    def play_audio_files(self, chunk_size: int, max_delay: int) -> None:
+    def play_audio_files(self, chunk_duration: float, max_delay: float) -> None:
         """Play audio files from the queue with audio effects and an initial delay.
 
         Args:
-            chunk_size (int): The number of frames to read at a time.
-            max_delay (int): The maximum delay in seconds to add at the end of the audio.
+            chunk_duration (float): The duration in seconds of audio to play at a time.
+            max_delay (float): The maximum delay in seconds to add at the end of the audio.
         """
         with AudioStream(output_device_name=AudioStream.default_output_device_name) as stream:
+            chunk_size = int(chunk_duration * stream.sample_rate)
+
             while True:
                 hypno_line = self.queue.get()
                 self._play_file(
@@ -55,45 +168,32 @@ class LinePlayer:
                     max_delay=max_delay,
                 )
 
-    def _play_file(self, *, hypno_line: HypnoLine, stream: AudioStream, chunk_size: int, max_delay: int) -> None:
+    def _play_file(self, *, hypno_line: HypnoLine, stream: AudioStream, chunk_size: int, max_delay: float) -> None:
         """Play a single audio file with the pedalboard effects."""
         print(hypno_line.text)
 
-        with AudioFile(str(hypno_line.filepath), "r").resampled_to(stream.sample_rate) as audio_file:  # ty:ignore[no-matching-overload, unresolved-attribute]
-            try:
-                audio_data = audio_file.read(audio_file.frames)
-            except ValueError as e:
-                logger.error(f"Error reading audio file {hypno_line.filepath}: {e}")
-            else:
-                # Add MAX_DELAY silence at the end (so that all delays can be heard)
-                audio_data = np.pad(
-                    audio_data,
-                    [(0, 0), (0, int((max_delay) * audio_file.samplerate))],
-                )
-
-                # Chunk the audio data to avoid memory issues
-                for start in range(0, len(audio_data), chunk_size):
-                    end = min(start + chunk_size, len(audio_data))
-                    chunk = audio_data[start:end]
-                    processed_chunk = self.pedalboard(chunk, audio_file.samplerate)
-                    stream.write(processed_chunk, stream.sample_rate)
+        try:
+            audio_data = self.rendered_line_audio.get(
+                self.pedalboard,
+                hypno_line.filepath,
+                stream.sample_rate,
+                max_delay,
+            )
+        except ValueError as e:
+            logger.error(f"Error reading audio file {hypno_line.filepath}: {e}")
+        else:
+            # Write the audio in chunks, so the stream is fed gradually rather than all at once
+            for start in range(0, audio_data.shape[1], chunk_size):
+                stream.write(audio_data[:, start : start + chunk_size], stream.sample_rate)
 
     @classmethod
-    def from_config(cls, config: Config) -> Self:
+    def from_config(cls, config: Config, *, rendered_line_audio: RenderedLineAudioCache) -> Self:
         """Return a LinePlayer instance configured with audio effects for echoes based on the provided configuration."""
-        boards = [
-            # Main voice with a pitch shift
-            Pedalboard([PitchShift(semitones=config.initial_pitch_shift)]),
-        ]
-
-        # Add echoes with decreasing pitch shift and volume, and increasing delay
-        boards.extend(
-            Pedalboard([
-                PitchShift(semitones=config.initial_pitch_shift - (i * 0.5)),  # Decrease pitch for each echo
-                Gain(gain_db=-12 * i),  # Decrease volume for each echo
-                Delay(delay_seconds=i * config.echo_delay, mix=0.5),  # Increase delay for each echo
-            ])
-            for i in range(1, config.max_echoes + 1)
+        return cls(
+            rendered_line_audio=rendered_line_audio,
+            pedalboard=_build_echo_pedalboard(
+                initial_pitch_shift=config.initial_pitch_shift,
+                max_echoes=config.max_echoes,
+                echo_delay=config.echo_delay,
+            ),
         )
-
-        return cls(pedalboard=Pedalboard([Mix(boards)]))  # ty:ignore[invalid-argument-type]
@@ -18,12 +18,16 @@ class RepeatingAudioPlayer:
         """Initialize the RepeatingAudioPlayer with a file path."""
         self.audio_filepath = audio_filepath
 
-    def play_audio_file(self, chunk_size: int) -> None:
-        """Play the audio file in a loop."""
+    def play_audio_file(self, chunk_duration: float) -> None:
+        """Play the audio file in a loop, writing `chunk_duration` seconds of audio at a time."""
         with AudioStream(output_device_name=AudioStream.default_output_device_name) as stream:
+            chunk_size = int(chunk_duration * stream.sample_rate)
+
+            # Decode and resample the file once, then loop over it in memory
+            with AudioFile(str(self.audio_filepath), "r").resampled_to(stream.sample_rate) as audio_file:  # ty:ignore[no-matching-overload, unresolved-attribute]
+                audio_data = audio_file.read(audio_file.frames)
+
             while True:
-                with AudioFile(str(self.audio_filepath), "r").resampled_to(stream.sample_rate) as audio_file:  # ty:ignore[no-matching-overload, unresolved-attribute]
-                    while audio_file.tell() < audio_file.frames:
-                        # Process and play the audio in chunks
-                        audio = audio_file.read(chunk_size)
-                        stream.write(audio, stream.sample_rate)
+                # Play the audio in chunks
+                for start in range(0, audio_data.shape[1], chunk_size):
+                    stream.write(audio_data[:, start : start + chunk_size], stream.sample_rate)
@@ -5,7 +5,7 @@ from pathlib import Path
 from typing import TYPE_CHECKING, Any, Self, cast
 
 from loguru import logger
-from pydantic import BaseModel, Field, ValidationError, field_validator
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
 
 from src.hypno_queue import HypnoLineChooserFn, get_default_line_chooser, get_line_choosers  # noqa: TC001
 
@@ -22,6 +22,9 @@ DEFAULT_TEXT_PATH = Path("./lines.txt")
 class Config(BaseModel):
     """Configuration for controlling various settings for hypno generation."""
 
+    # The configuration is loaded once at startup and never changed afterwards
+    model_config = ConfigDict(frozen=True)
+
     background_audio: str | None = Field(
         default=DEFAULT_BACKGROUND_AUDIO,
         description="Type of background audio to play.",
@@ -133,23 +136,26 @@ class Config(BaseModel):
             FileNotFoundError: If the JSON configuration file does not exist.
             ValidationError: If the JSON file does not conform to the expected schema.
         """
-        if json_filepath.exists():
-            try:
-                logger.debug(f"Loading configuration from {json_filepath}")
-                config = cls.model_validate_json(
-                    json_filepath.read_text(encoding="utf-8"),
-                    context={
-                        "available_backgrounds": available_backgrounds,
-                    },
-                )
-                logger.debug(f"Configuration loaded: {config}")
-            except ValidationError as e:
-                logger.error(f"Failed to validate configuration from {json_filepath}: {e}")
-                raise
-        else:
-            msg = f"Configuration file {json_filepath} not found."
-            raise FileNotFoundError(msg)
+        logger.debug(f"Loading configuration from {json_filepath}")
 
+        try:
+            json_data = json_filepath.read_bytes()
+        except FileNotFoundError as e:
+            msg = f"Configuration file {json_filepath} not found."
+            raise FileNotFoundError(msg) from e
+
+        try:
+            config = cls.model_validate_json(
+                json_data,
+                context={
+                    "available_backgrounds": available_backgrounds,
+                },
+            )
+        except ValidationError as e:
+            logger.error(f"Failed to validate configuration from {json_filepath}: {e}")
+            raise
+
+        logger.debug(f"Configuration loaded: {config}")
         return config
 
 
@@ -20,6 +20,8 @@ class HypnoLine:
         duration (float | None): The duration of the audio file in seconds, if known.
     """
 
+    __slots__ = ("duration", "filepath", "text")
+
     text: str
     filepath: Path
     duration: float | None
@@ -47,16 +49,20 @@ class HypnoLine:
         """Sets the duration of the audio file associated with this HypnoLine.
 
         Raises:
-            FileNotFoundError: If the audio file does not exist.
+            FileNotFoundError: If the audio file does not exist or can't be opened (e.g. it is still being written).
         """
-        if self.filepath.exists():
-            logger.debug(f"Setting duration for audio file: {self.text}")
-            with AudioFile(str(self.filepath), "r") as audio_file:  # ty:ignore[no-matching-overload, invalid-context-manager]
-                self.duration = audio_file.duration + 1
-                logger.debug(f"Duration set to {self.duration} seconds for {self.text}")
-        else:
-            msg = f"Audio file {self.filepath} does not exist."
-            raise FileNotFoundError(msg)
+        logger.debug(f"Setting duration for audio file: {self.text}")
+
+        try:
+            audio_file = AudioFile(str(self.filepath), "r")  # ty:ignore[no-matching-overload]
+        except ValueError as e:
+            # pedalboard raises a ValueError, rather than a FileNotFoundError, for a missing or unreadable file
+            msg = f"Audio file {self.filepath} could not be opened: {e}"
+            raise FileNotFoundError(msg) from e
+
+        with audio_file:  # ty:ignore[invalid-context-manager]
+            self.duration = audio_file.duration + 1  # ty:ignore[unresolved-attribute]
+            logger.debug(f"Duration set to {self.duration} seconds for {self.text}")
 
 
 def clean_line(text: str) -> str:
@@ -1,22 +1,54 @@
 from __future__ import annotations
 
-import multiprocessing.synchronize
 import random
+import threading
 import time
 from collections.abc import Callable, Iterator, Mapping
 from typing import TYPE_CHECKING
 
+from loguru import logger
+
 from src.hypno_line import HypnoLine
 
 if TYPE_CHECKING:
+    import multiprocessing.queues
+
     from src.audio.line_player import LinePlayer
 
 type HypnoLineChooserFn = Callable[
-    [Mapping[str, HypnoLine], multiprocessing.synchronize.Lock],
+    [Mapping[str, HypnoLine], threading.Condition],
     Iterator[HypnoLine],
 ]
 
-SLEEP_PERIOD = 1
+
+def update_hypno_line_mapping(
+    *,
+    hypno_line_updates: multiprocessing.queues.Queue[dict[str, HypnoLine]],
+    hypno_line_mapping: dict[str, HypnoLine],
+    hypno_lines_condition: threading.Condition,
+    on_update: Callable[[Mapping[str, HypnoLine]], None] | None = None,
+) -> None:
+    """Replace the contents of the hypno line mapping with each new mapping sent by the audio generator.
+
+    Args:
+        hypno_line_updates (multiprocessing.queues.Queue[dict[str, HypnoLine]]): Queue of new mappings of lines to
+            their corresponding HypnoLine objects.
+        hypno_line_mapping (dict[str, HypnoLine]): The mapping of line identifiers to HypnoLine objects to update.
+        hypno_lines_condition (threading.Condition): A condition to ensure thread-safe access to the hypno lines,
+            notified when they change.
+        on_update (Callable[[Mapping[str, HypnoLine]], None] | None): Called with each new mapping once it has
+            replaced the contents of the hypno line mapping.
+    """
+    while True:
+        new_hypno_line_mapping = hypno_line_updates.get()
+
+        with hypno_lines_condition:
+            hypno_line_mapping.clear()
+            hypno_line_mapping.update(new_hypno_line_mapping)
+            hypno_lines_condition.notify_all()
+
+        if on_update is not None:
+            on_update(new_hypno_line_mapping)
 
 
 def queue_hypno_lines(
@@ -24,7 +56,7 @@ def queue_hypno_lines(
     hypno_line_chooser: HypnoLineChooserFn,
     line_players: list[LinePlayer],
     hypno_line_mapping: dict[str, HypnoLine],
-    hypno_lines_lock: multiprocessing.synchronize.Lock,
+    hypno_lines_condition: threading.Condition,
 ) -> None:
     """Queue HypnoLines from the generator to the line players.
 
@@ -32,9 +64,10 @@ def queue_hypno_lines(
         hypno_line_chooser (HypnoLineChooserFn): A function that returns an iterator of HypnoLine objects.
         line_players (list[LinePlayer]): A list of LinePlayer instances to queue the HypnoLines to.
         hypno_line_mapping (dict[str, HypnoLine]): A mapping of line identifiers to HypnoLine objects.
-        hypno_lines_lock (multiprocessing.synchronize.Lock): A lock to ensure thread-safe access to the hypno lines.
+        hypno_lines_condition (threading.Condition): A condition to ensure thread-safe access to the hypno lines,
+            notified when they change.
     """
-    hypno_line_iterator = hypno_line_chooser(hypno_line_mapping, hypno_lines_lock)
+    hypno_line_iterator = hypno_line_chooser(hypno_line_mapping, hypno_lines_condition)
     current_player_index = 0
 
     for hypno_line in hypno_line_iterator:
@@ -43,15 +76,12 @@ def queue_hypno_lines(
             try:
                 hypno_line.set_duration()
             except FileNotFoundError:
-                print(f"Audio file not ready for: {hypno_line.text}")
+                logger.warning(f"Audio file not ready for: {hypno_line.text}")
                 continue
 
         current_player = line_players[current_player_index]
 
-        # Wait for the current player's queue to have space
-        while current_player.queue.full():
-            time.sleep(0.1)
-
+        # Blocks until the current player's queue has space
         current_player.queue.put(hypno_line)
 
         # Schedule the next assignment after this line's duration
@@ -112,33 +142,32 @@ def register_line_chooser(name: str) -> Callable[[HypnoLineChooserFn], HypnoLine
 @register_line_chooser("sequential")
 def get_sequential_lines(
     hypno_line_mapping: Mapping[str, HypnoLine],
-    hypno_lines_lock: multiprocessing.synchronize.Lock,
+    hypno_lines_condition: threading.Condition,
 ) -> Iterator[HypnoLine]:
     """Infinitely yield HypnoLine objects in the order, only checking for changes once all items have been yielded.
 
     Args:
         hypno_line_mapping (Mapping[str, HypnoLine]): A mapping of lines to their corresponding HypnoLine objects.
-        hypno_lines_lock (multiprocessing.synchronize.Lock): A lock to ensure thread-safe access to the hypno lines.
+        hypno_lines_condition (threading.Condition): A condition to ensure thread-safe access to the hypno lines,
+            notified when they change.
 
     Yields:
         HypnoLine: The next HypnoLine object from the hypno line mapping.
     """
     while True:
-        with hypno_lines_lock:
+        with hypno_lines_condition:
+            # Wait for lines to be available
+            hypno_lines_condition.wait_for(lambda: hypno_line_mapping)
             hypno_lines = list(hypno_line_mapping.values())
 
-        # No lines available, so wait before checking again
-        if not hypno_lines:
-            time.sleep(SLEEP_PERIOD)
-            continue
-
-        yield from hypno_lines
+        # Yield from a copy outside the condition, so updates to the mapping aren't blocked while lines are played
+        yield from hypno_lines  # noqa: RUF070
 
 
 @register_line_chooser("sequential_refreshing")
 def get_sequential_refreshing_lines(
     hypno_line_mapping: Mapping[str, HypnoLine],
-    hypno_lines_lock: multiprocessing.synchronize.Lock,
+    hypno_lines_condition: threading.Condition,
 ) -> Iterator[HypnoLine]:
     """Infinitely yield HypnoLine objects in the order, checking for changes in the mapping during iteration.
 
@@ -147,40 +176,31 @@ def get_sequential_refreshing_lines(
 
     Args:
         hypno_line_mapping (Mapping[str, HypnoLine]): A mapping of lines to their corresponding HypnoLine objects.
-        hypno_lines_lock (multiprocessing.synchronize.Lock): A lock to ensure thread-safe access to the hypno lines.
+        hypno_lines_condition (threading.Condition): A condition to ensure thread-safe access to the hypno lines,
+            notified when they change.
 
     Yields:
         HypnoLine: The next HypnoLine object from the hypno line mapping.
     """
-    last_keys = None
-
     while True:
-        with hypno_lines_lock:
+        with hypno_lines_condition:
+            # Wait for lines to be available
+            hypno_lines_condition.wait_for(lambda: hypno_line_mapping)
             hypno_lines = list(hypno_line_mapping.values())
             current_keys = tuple(hypno_line_mapping.keys())
 
-        if not hypno_lines:
-            time.sleep(SLEEP_PERIOD)
-            continue
-
-        if last_keys is not None and current_keys != last_keys:
-            # Dict changed, restart iteration
-            last_keys = current_keys
-            continue
-
-        last_keys = current_keys
         for hypno_line in hypno_lines:
-            with hypno_lines_lock:
+            with hypno_lines_condition:
                 # Check if dict changed during iteration
-                if tuple(hypno_line_mapping.keys()) != last_keys:
-                    break  # Restart outer while loop
+                if tuple(hypno_line_mapping.keys()) != current_keys:
+                    break  # Restart outer while loop with the new lines
             yield hypno_line
 
 
 @register_line_chooser("shuffled")
 def get_shuffled_lines(
     hypno_line_mapping: Mapping[str, HypnoLine],
-    hypno_lines_lock: multiprocessing.synchronize.Lock,
+    hypno_lines_condition: threading.Condition,
 ) -> Iterator[HypnoLine]:
     """Infinitely yield HypnoLine objects in a random order, playing all lines before shuffling again.
 
@@ -188,7 +208,8 @@ def get_shuffled_lines(
 
     Args:
         hypno_line_mapping (Mapping[str, HypnoLine]): A mapping of lines to their corresponding HypnoLine objects.
-        hypno_lines_lock (multiprocessing.synchronize.Lock): A lock to ensure thread-safe access to the hypno lines.
+        hypno_lines_condition (threading.Condition): A condition to ensure thread-safe access to the hypno lines,
+            notified when they change.
 
     Yields:
         HypnoLine: The next HypnoLine object from the hypno line mapping in a random order.
@@ -196,13 +217,11 @@ def get_shuffled_lines(
     last_hypno_line = None
 
     while True:
-        with hypno_lines_lock:
+        with hypno_lines_condition:
+            # Wait for lines to be available
+            hypno_lines_condition.wait_for(lambda: hypno_line_mapping)
             hypno_lines = list(hypno_line_mapping.values())
 
-        if not hypno_lines:
-            time.sleep(SLEEP_PERIOD)
-            continue
-
         random.shuffle(hypno_lines)
 
         for hypno_line in hypno_lines:
@@ -216,7 +235,7 @@ def get_shuffled_lines(
 @register_line_chooser("random")
 def get_random_lines(
     hypno_line_mapping: Mapping[str, HypnoLine],
-    hypno_lines_lock: multiprocessing.synchronize.Lock,
+    hypno_lines_condition: threading.Condition,
 ) -> Iterator[HypnoLine]:
     """Infinitely yield HypnoLine objects in a random order, rechecking for changes after each line.
 
@@ -224,7 +243,8 @@ def get_random_lines(
 
     Args:
         hypno_line_mapping (Mapping[str, HypnoLine]): A mapping of lines to their corresponding HypnoLine objects.
-        hypno_lines_lock (multiprocessing.synchronize.Lock): A lock to ensure thread-safe access to the hypno lines.
+        hypno_lines_condition (threading.Condition): A condition to ensure thread-safe access to the hypno lines,
+            notified when they change.
 
     Yields:
         HypnoLine: The next HypnoLine object from the hypno line mapping in a random order.
@@ -232,16 +252,13 @@ def get_random_lines(
     last_hypno_line = None
 
     while True:
-        with hypno_lines_lock:
+        with hypno_lines_condition:
+            # Wait for lines to be available
+            hypno_lines_condition.wait_for(lambda: hypno_line_mapping)
             hypno_lines = list(hypno_line_mapping.values())
 
-        if not hypno_lines:
-            time.sleep(SLEEP_PERIOD)
-            continue
-
-        hypno_line = random.choice(hypno_lines)  # noqa: S311
-
-        if (len(hypno_lines) > 1 and hypno_line != last_hypno_line) or len(hypno_lines) == 1:
-            yield hypno_line
+        # Choose from every line except the last one played, unless it's the only line
+        candidate_lines = [hypno_line for hypno_line in hypno_lines if hypno_line != last_hypno_line] or hypno_lines
 
-        last_hypno_line = hypno_line
+        last_hypno_line = random.choice(candidate_lines)  # noqa: S311
+        yield last_hypno_line
@@ -9,4 +9,6 @@ def configure_logger(*, debug: bool) -> None:
     _ = logger.add(
         sys.stderr,
         level="DEBUG" if debug else "WARNING",
+        # Write log messages from a background thread, so logging never blocks the audio threads on stderr
+        enqueue=True,
     )
@@ -0,0 +1,14 @@
+from pathlib import Path
+
+from main import BACKGROUND_AUDIO
+from src.config import Config
+
+
+def test_config_from_args_loads_config_file() -> None:
+    # Also checks that every type used by Config's fields can be resolved at runtime
+    config = Config.from_args(
+        json_filepath=Path(__file__).parent.parent / "config.json",
+        available_backgrounds=BACKGROUND_AUDIO.keys(),
+    )
+
+    assert config.background_audio in BACKGROUND_AUDIO
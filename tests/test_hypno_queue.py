@@ -1,36 +1,67 @@
-import multiprocessing
+import threading
+from collections.abc import Mapping
 from pathlib import Path
+from queue import Queue
 
 import pytest
 
 from src.hypno_line import HypnoLine
-from src.hypno_queue import get_random_lines, get_sequential_lines, get_sequential_refreshing_lines, get_shuffled_lines
+from src.hypno_queue import (
+    HypnoLineChooserFn,  # noqa: TC001
+    get_line_choosers,
+    get_random_lines,
+    get_sequential_lines,
+    get_sequential_refreshing_lines,
+    get_shuffled_lines,
+    update_hypno_line_mapping,
+)
 
 
 @pytest.fixture
-def lock() -> multiprocessing.synchronize.Lock:  # ty:ignore[possibly-missing-attribute]
-    """Fixture to provide a multiprocessing lock."""
-    manager = multiprocessing.Manager()
-    return manager.Lock()
+def condition() -> threading.Condition:
+    """Fixture to provide a condition."""
+    return threading.Condition()
+
+
+def start_mapping_updater(
+    mapping: dict[str, HypnoLine],
+    condition: threading.Condition,
+) -> tuple[Queue[dict[str, HypnoLine]], Queue[Mapping[str, HypnoLine]]]:
+    """Start updating the mapping in the background, returning the queue of updates and a queue of applied updates."""
+    hypno_line_updates = Queue[dict[str, HypnoLine]]()
+    applied_updates = Queue[Mapping[str, HypnoLine]]()
+
+    threading.Thread(
+        target=update_hypno_line_mapping,
+        kwargs={
+            "hypno_line_updates": hypno_line_updates,
+            "hypno_line_mapping": mapping,
+            "hypno_lines_condition": condition,
+            "on_update": applied_updates.put,
+        },
+        daemon=True,
+    ).start()
+
+    return hypno_line_updates, applied_updates
 
 
 # SEQUENTIAL LINES TESTS
 # ======================
-def test_get_sequential_lines_single(lock: multiprocessing.synchronize.Lock) -> None:  # ty:ignore[possibly-missing-attribute]
+def test_get_sequential_lines_single(condition: threading.Condition) -> None:
     hypno_line = HypnoLine(text="1", filepath=Path("1.wav"))
 
     mapping: dict[str, HypnoLine] = {
         "1": hypno_line,
     }
 
-    line_generator = get_sequential_lines(mapping, lock)
+    line_generator = get_sequential_lines(mapping, condition)
 
     # Checking that the same HypnoLine instance is returned
     assert next(line_generator) == hypno_line
     assert next(line_generator) == hypno_line
 
 
-def test_get_sequential_lines_multiple(lock: multiprocessing.synchronize.Lock) -> None:  # ty:ignore[possibly-missing-attribute]
+def test_get_sequential_lines_multiple(condition: threading.Condition) -> None:
     hypno_line1 = HypnoLine(text="1", filepath=Path("1.wav"))
     hypno_line2 = HypnoLine(text="2", filepath=Path("2.wav"))
 
@@ -39,7 +70,7 @@ def test_get_sequential_lines_multiple(lock: multiprocessing.synchronize.Lock) -
         "2": hypno_line2,
     }
 
-    line_generator = get_sequential_lines(mapping, lock)
+    line_generator = get_sequential_lines(mapping, condition)
 
     # Checking that the generator returns the correct HypnoLines in order
     assert next(line_generator) == hypno_line1
@@ -47,7 +78,7 @@ def test_get_sequential_lines_multiple(lock: multiprocessing.synchronize.Lock) -
     assert next(line_generator) == hypno_line1  # Should loop back to the first line
 
 
-def test_get_sequential_lines_changing_lines(lock: multiprocessing.synchronize.Lock) -> None:  # ty:ignore[possibly-missing-attribute]
+def test_get_sequential_lines_changing_lines(condition: threading.Condition) -> None:
     hypno_line1 = HypnoLine(text="1", filepath=Path("1.wav"))
     hypno_line2 = HypnoLine(text="2", filepath=Path("2.wav"))
 
@@ -56,7 +87,7 @@ def test_get_sequential_lines_changing_lines(lock: multiprocessing.synchronize.L
         "2": hypno_line2,
     }
 
-    line_generator = get_sequential_lines(mapping, lock)
+    line_generator = get_sequential_lines(mapping, condition)
 
     assert next(line_generator) == hypno_line1
 
@@ -73,21 +104,21 @@ def test_get_sequential_lines_changing_lines(lock: multiprocessing.synchronize.L
 
 # SEQUENTIAL REFRESHING LINES TESTS
 # =================================
-def test_get_sequential_refreshing_lines_single(lock: multiprocessing.synchronize.Lock) -> None:  # ty:ignore[possibly-missing-attribute]
+def test_get_sequential_refreshing_lines_single(condition: threading.Condition) -> None:
     hypno_line = HypnoLine(text="1", filepath=Path("1.wav"))
 
     mapping: dict[str, HypnoLine] = {
         "1": hypno_line,
     }
 
-    line_generator = get_sequential_refreshing_lines(mapping, lock)
+    line_generator = get_sequential_refreshing_lines(mapping, condition)
 
     # Checking that the same HypnoLine instance is returned
     assert next(line_generator) == hypno_line
     assert next(line_generator) == hypno_line
 
 
-def test_get_sequential_refreshing_lines_multiple(lock: multiprocessing.synchronize.Lock) -> None:  # ty:ignore[possibly-missing-attribute]
+def test_get_sequential_refreshing_lines_multiple(condition: threading.Condition) -> None:
     hypno_line1 = HypnoLine(text="1", filepath=Path("1.wav"))
     hypno_line2 = HypnoLine(text="2", filepath=Path("2.wav"))
 
@@ -96,7 +127,7 @@ def test_get_sequential_refreshing_lines_multiple(lock: multiprocessing.synchron
         "2": hypno_line2,
     }
 
-    line_generator = get_sequential_refreshing_lines(mapping, lock)
+    line_generator = get_sequential_refreshing_lines(mapping, condition)
 
     # Checking that the generator returns the correct HypnoLines in order
     assert next(line_generator) == hypno_line1
@@ -104,7 +135,7 @@ def test_get_sequential_refreshing_lines_multiple(lock: multiprocessing.synchron
     assert next(line_generator) == hypno_line1  # Should loop back to the first
 
 
-def test_get_sequential_refreshing_lines_changing_lines(lock: multiprocessing.synchronize.Lock) -> None:  # ty:ignore[possibly-missing-attribute]
+def test_get_sequential_refreshing_lines_changing_lines(condition: threading.Condition) -> None:
     hypno_line1 = HypnoLine(text="1", filepath=Path("1.wav"))
     hypno_line2 = HypnoLine(text="2", filepath=Path("2.wav"))
 
@@ -113,7 +144,7 @@ def test_get_sequential_refreshing_lines_changing_lines(lock: multiprocessing.sy
         "2": hypno_line2,
     }
 
-    line_generator = get_sequential_refreshing_lines(mapping, lock)
+    line_generator = get_sequential_refreshing_lines(mapping, condition)
 
     assert next(line_generator) == hypno_line1
     # Change the mapping to a new set of lines
@@ -129,21 +160,21 @@ def test_get_sequential_refreshing_lines_changing_lines(lock: multiprocessing.sy
 
 # SHUFFLED LINES TESTS
 # ====================
-def test_get_shuffled_lines_single(lock: multiprocessing.synchronize.Lock) -> None:  # ty:ignore[possibly-missing-attribute]
+def test_get_shuffled_lines_single(condition: threading.Condition) -> None:
     hypno_line = HypnoLine(text="1", filepath=Path("1.wav"))
 
     mapping: dict[str, HypnoLine] = {
         "1": hypno_line,
     }
 
-    line_generator = get_shuffled_lines(mapping, lock)
+    line_generator = get_shuffled_lines(mapping, condition)
 
     # Checking that the same HypnoLine instance is returned even though it's a repeat (as it's the only one)
     assert next(line_generator) == hypno_line
     assert next(line_generator) == hypno_line
 
 
-def test_get_shuffled_lines_no_repeat_line(lock: multiprocessing.synchronize.Lock) -> None:  # ty:ignore[possibly-missing-attribute]
+def test_get_shuffled_lines_no_repeat_line(condition: threading.Condition) -> None:
     hypno_line1 = HypnoLine(text="1", filepath=Path("1.wav"))
     hypno_line2 = HypnoLine(text="2", filepath=Path("2.wav"))
 
@@ -152,7 +183,7 @@ def test_get_shuffled_lines_no_repeat_line(lock: multiprocessing.synchronize.Loc
         "2": hypno_line2,
     }
 
-    line_generator = get_shuffled_lines(mapping, lock)
+    line_generator = get_shuffled_lines(mapping, condition)
 
     # Checking that the generator never returns the same HypnoLine twice in a row
     for _ in range(1000):  # Check multiple iterations
@@ -162,21 +193,21 @@ def test_get_shuffled_lines_no_repeat_line(lock: multiprocessing.synchronize.Loc
 
 # RANDOM LINES TESTS
 # ==================
-def test_get_random_lines_single(lock: multiprocessing.synchronize.Lock) -> None:  # ty:ignore[possibly-missing-attribute]
+def test_get_random_lines_single(condition: threading.Condition) -> None:
     hypno_line = HypnoLine(text="1", filepath=Path("1.wav"))
 
     mapping: dict[str, HypnoLine] = {
         "1": hypno_line,
     }
 
-    line_generator = get_random_lines(mapping, lock)
+    line_generator = get_random_lines(mapping, condition)
 
     # Checking that the same HypnoLine instance is returned even though it's a repeat (as it's the only one)
     assert next(line_generator) == hypno_line
     assert next(line_generator) == hypno_line
 
 
-def test_get_random_lines_multiple(lock: multiprocessing.synchronize.Lock) -> None:  # ty:ignore[possibly-missing-attribute]
+def test_get_random_lines_multiple(condition: threading.Condition) -> None:
     hypno_line1 = HypnoLine(text="1", filepath=Path("1.wav"))
     hypno_line2 = HypnoLine(text="2", filepath=Path("2.wav"))
 
@@ -185,9 +216,123 @@ def test_get_random_lines_multiple(lock: multiprocessing.synchronize.Lock) -> No
         "2": hypno_line2,
     }
 
-    line_generator = get_random_lines(mapping, lock)
+    line_generator = get_random_lines(mapping, condition)
 
     # Checking that the generator never returns the same HypnoLine twice in a row
     for _ in range(1000):  # Check multiple iterations
         initial_line = next(line_generator)
         assert next(line_generator) != initial_line
+
+
+# ALL LINE CHOOSERS TESTS
+# =======================
+@pytest.mark.parametrize("line_chooser", get_line_choosers().values(), ids=get_line_choosers().keys())
+def test_line_chooser_waits_for_lines(line_chooser: HypnoLineChooserFn, condition: threading.Condition) -> None:
+    hypno_line = HypnoLine(text="1", filepath=Path("1.wav"))
+
+    mapping: dict[str, HypnoLine] = {}
+
+    def add_line() -> None:
+        with condition:
+            mapping["1"] = hypno_line
+            condition.notify_all()
+
+    line_generator = line_chooser(mapping, condition)
+    yielded_lines: list[HypnoLine] = []
+
+    # The generator should wait until lines are added and it's notified (with a timeout, so a missed wake-up fails
+    # the test rather than hanging it)
+    waiting_thread = threading.Thread(target=lambda: yielded_lines.append(next(line_generator)), daemon=True)
+    waiting_thread.start()
+    add_line_timer = threading.Timer(0.1, add_line)
+    add_line_timer.start()
+    waiting_thread.join(timeout=5)
+    add_line_timer.join()
+
+    assert yielded_lines == [hypno_line]
+
+
+# UPDATE HYPNO LINE MAPPING TESTS
+# ===============================
+def test_update_hypno_line_mapping_replaces_in_place(condition: threading.Condition) -> None:
+    hypno_line1 = HypnoLine(text="1", filepath=Path("1.wav"))
+    hypno_line2 = HypnoLine(text="2", filepath=Path("2.wav"))
+    hypno_line3 = HypnoLine(text="3", filepath=Path("3.wav"))
+
+    mapping: dict[str, HypnoLine] = {
+        "1": hypno_line1,
+        "2": hypno_line2,
+    }
+    original_mapping = mapping
+
+    hypno_line_updates, applied_updates = start_mapping_updater(mapping, condition)
+
+    # Lines missing from the update are removed, and new lines are added to the same dict
+    hypno_line_updates.put({"1": hypno_line1, "3": hypno_line3})
+    applied_updates.get(timeout=5)
+
+    assert mapping is original_mapping
+    assert mapping == {"1": hypno_line1, "3": hypno_line3}
+
+
+def test_update_hypno_line_mapping_wakes_waiting_choosers(condition: threading.Condition) -> None:
+    hypno_line = HypnoLine(text="1", filepath=Path("1.wav"))
+    mapping: dict[str, HypnoLine] = {}
+
+    hypno_line_updates, applied_updates = start_mapping_updater(mapping, condition)
+
+    # Every chooser waiting for lines should be woken up by the update, not just one of them
+    line_generators = [get_sequential_lines(mapping, condition), get_random_lines(mapping, condition)]
+    yielded_lines: list[HypnoLine] = []
+    waiting_threads = [
+        threading.Thread(target=lambda gen=line_generator: yielded_lines.append(next(gen)), daemon=True)
+        for line_generator in line_generators
+    ]
+    for waiting_thread in waiting_threads:
+        waiting_thread.start()
+
+    hypno_line_updates.put({"1": hypno_line})
+    applied_updates.get(timeout=5)
+
+    for waiting_thread in waiting_threads:
+        waiting_thread.join(timeout=5)
+
+    assert yielded_lines == [hypno_line, hypno_line]
+
+
+def test_update_hypno_line_mapping_empty_update_keeps_choosers_waiting(condition: threading.Condition) -> None:
+    hypno_line = HypnoLine(text="1", filepath=Path("1.wav"))
+
+    class CheckCountingDict(dict[str, HypnoLine]):  # noqa: FURB189
+        """A dict that counts how many times it's checked for lines."""
+
+        checks = 0
+
+        def __len__(self) -> int:
+            self.checks += 1
+            return super().__len__()
+
+    mapping = CheckCountingDict()
+
+    hypno_line_updates, applied_updates = start_mapping_updater(mapping, condition)
+
+    line_generator = get_sequential_lines(mapping, condition)
+    yielded_lines: list[HypnoLine] = []
+    waiting_thread = threading.Thread(target=lambda: yielded_lines.append(next(line_generator)), daemon=True)
+    waiting_thread.start()
+
+    # An empty update wakes the chooser, which should check once and go back to waiting rather than spinning
+    hypno_line_updates.put({})
+    applied_updates.get(timeout=5)
+    waiting_thread.join(timeout=0.2)
+
+    assert waiting_thread.is_alive()
+    assert not yielded_lines
+    assert mapping.checks <= 2  # noqa: PLR2004
+
+    # The chooser still picks up the lines once there are some
+    hypno_line_updates.put({"1": hypno_line})
+    applied_updates.get(timeout=5)
+    waiting_thread.join(timeout=5)
+
+    assert yielded_lines == [hypno_line]
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+from pedalboard import Pedalboard
+from pedalboard.io import AudioFile
+
+from src.audio import line_player
+from src.audio.line_player import RenderedLineAudioCache
+from src.hypno_line import HypnoLine
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+SAMPLE_RATE = 44100
+
+
+def write_audio_file(filepath: Path) -> Path:
+    """Write a short stereo audio file to the given path."""
+    with AudioFile(str(filepath), "w", SAMPLE_RATE, 2) as audio_file:  # ty:ignore[no-matching-overload, invalid-context-manager]
+        audio_file.write(np.zeros((2, SAMPLE_RATE), dtype=np.float32))
+    return filepath
+
+
+def test_rendered_line_audio_reused_until_line_removed(tmp_path: Path) -> None:
+    filepath = write_audio_file(tmp_path / "1.wav")
+    pedalboard = Pedalboard([])
+    rendered_line_audio = RenderedLineAudioCache()
+
+    rendered_audio = rendered_line_audio.get(pedalboard, filepath, SAMPLE_RATE, 1.0)
+
+    # The line audio is rendered with the delay padding, and reused for every later play
+    assert rendered_audio.shape == (2, SAMPLE_RATE * 2)
+    assert rendered_line_audio.get(pedalboard, filepath, SAMPLE_RATE, 1.0) is rendered_audio
+
+    # Lines still in the mapping keep their rendered audio
+    rendered_line_audio.retain_lines({"1": HypnoLine(text="1", filepath=filepath)})
+    assert rendered_line_audio.get(pedalboard, filepath, SAMPLE_RATE, 1.0) is rendered_audio
+
+    # Lines removed from the mapping are rendered again if they come back
+    rendered_line_audio.retain_lines({})
+    rendered_line_audio.retain_lines({"1": HypnoLine(text="1", filepath=filepath)})
+    assert rendered_line_audio.get(pedalboard, filepath, SAMPLE_RATE, 1.0) is not rendered_audio
+
+
+def test_rendered_line_audio_not_kept_for_removed_line(tmp_path: Path) -> None:
+    filepath = write_audio_file(tmp_path / "1.wav")
+    pedalboard = Pedalboard([])
+    rendered_line_audio = RenderedLineAudioCache()
+    rendered_line_audio.retain_lines({"2": HypnoLine(text="2", filepath=tmp_path / "2.wav")})
+
+    # A line from an older snapshot of the mapping can still be played, but its audio isn't cached again
+    rendered_audio = rendered_line_audio.get(pedalboard, filepath, SAMPLE_RATE, 1.0)
+    assert rendered_line_audio.get(pedalboard, filepath, SAMPLE_RATE, 1.0) is not rendered_audio
+
+
+def test_rendered_line_audio_not_kept_when_line_removed_while_rendering(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    filepath = write_audio_file(tmp_path / "1.wav")
+    pedalboard = Pedalboard([])
+    rendered_line_audio = RenderedLineAudioCache()
+    rendered_line_audio.retain_lines({"1": HypnoLine(text="1", filepath=filepath)})
+
+    render_line_audio = line_player._render_line_audio  # noqa: SLF001
+
+    def render_line_audio_then_remove_line(
+        pedalboard: Pedalboard,
+        filepath: Path,
+        sample_rate: float,
+        max_delay: float,
+    ) -> np.ndarray:
+        rendered_audio = render_line_audio(pedalboard, filepath, sample_rate, max_delay)
+        rendered_line_audio.retain_lines({})
+        return rendered_audio
+
+    monkeypatch.setattr(line_player, "_render_line_audio", render_line_audio_then_remove_line)
+
+    rendered_audio = rendered_line_audio.get(pedalboard, filepath, SAMPLE_RATE, 1.0)
+    assert rendered_line_audio.get(pedalboard, filepath, SAMPLE_RATE, 1.0) is not rendered_audio